@@ -3,31 +3,234 @@ A concrete DataExtractor that fetches objects from a Google Cloud Storage
 bucket, extracts plain‑text, and returns it to the GenAI assistant.
 
 Supported file types:
-    • PDF   → pdfminer.six
-    • DOCX  → python-docx
-    • PPTX  → python-pptx
+    • PDF   → PyMuPDF (fitz), falling back to pdfminer.six, then pypdfium2
+    • DOCX  → word/document.xml text nodes (zipfile + lxml)
+    • PPTX  → ppt/slides/slide*.xml text nodes (zipfile + lxml)
     • TXT   → read as plain UTF‑8 text
     • Audio (wav, mp3, flac, m4a) → Cloud Speech‑to‑Text
     • Video (mp4, avi, mov, mkv) → Cloud Video Intelligence (speech transcription)
 
+Local‑parse extractors (PDF / DOCX / PPTX / TXT) accept either a path on disk
+or an in‑memory file object, so blobs can be parsed straight from RAM without a
+round trip through /tmp.
+
 If an extraction fails, the method returns an empty string and prints a warning –
 this keeps the rest of the pipeline running.
 """
 #cat > data_extractor.py << 'EOF'
+import io
+import mmap
+import multiprocessing
 import os
-import tempfile
-from typing import Optional
+import posixpath
+import re
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from functools import cached_property
+from typing import Any, BinaryIO, Callable, Dict, List, Optional, Tuple, Union
 
 from google.cloud import storage, speech, videointelligence
 
 # ---------- PDF ----------
-from pdfminer.high_level import extract_text as pdf_extract_text
+import fitz                                     # PyMuPDF – fast C-backed extractor
+from pdfminer.high_level import extract_text as pdf_extract_text   # fallback only
+import pypdfium2 as pdfium                      # last resort – C++, predictable runtime
+
+# ---------- DOCX / PPTX ----------
+# Both are zipped XML; walking the text nodes directly skips the
+# python-docx / python-pptx object models entirely.
+from lxml import etree
+
+_W_NS = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+_A_NS = "{http://schemas.openxmlformats.org/drawingml/2006/main}"
+_P_NS = "{http://schemas.openxmlformats.org/presentationml/2006/main}"
+_R_NS = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}"
+_REL_NS = "{http://schemas.openxmlformats.org/package/2006/relationships}"
+# Word writes every text box twice: a DrawingML copy under mc:Choice and a
+# VML copy under mc:Fallback for old readers – only the first one is read.
+_MC_FALLBACK = "{http://schemas.openxmlformats.org/markup-compatibility/2006}Fallback"
+_SLIDE_RE = re.compile(r"ppt/slides/slide(\d+)\.xml")
+
+# Every process pool (parse workers, PDF page ranges, the pdfminer
+# watchdog) starts its children this way, never with fork(): pools are
+# created while download and gRPC threads are running, and a forked child
+# can inherit a lock one of them held.
+MP_CONTEXT = multiprocessing.get_context(
+    "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+)
+
+
+# ----------------------------------------------------------------------
+# Page‑parallel PDF extraction.
+# Scaling flattens out past ~8 workers, and short documents are done
+# before a pool has even started – so only fan out for long PDFs.
+# ----------------------------------------------------------------------
+PDF_MAX_WORKERS = min(8, os.cpu_count() or 1)
+PDF_PARALLEL_MIN_PAGES = 16
+
+# pdfminer can take hours on pathological files; past this many seconds its
+# worker processes are killed and pypdfium2 gets a turn instead.
+PDFMINER_TIMEOUT = 30
+
+# What the local‑parse extractors accept: a path, or an open binary file object.
+FileSource = Union[str, BinaryIO]
+
+# Speech transcription runs as server‑side long‑running operations; we only
+# wait on them, so a thread per in‑flight operation is plenty.
+MEDIA_MAX_WORKERS = 16
+MEDIA_TIMEOUT     = 1800          # seconds to wait for a single operation
+
+# Sent to the Video Intelligence API; everything else goes to Speech‑to‑Text.
+VIDEO_EXTENSIONS = {".mp4", ".avi", ".mov", ".mkv"}
+
+# Downloads are validated against the object's CRC32C – the same checksum
+# the extraction cache is keyed by, so nothing truncated or corrupted can be
+# cached under a valid key.  (Setting a blob chunk_size would switch to
+# ranged downloads, which skip validation altogether.)
+DOWNLOAD_CHECKSUM = "crc32c"
+
+
+def segments_to_text(segments: List[Dict[str, Any]]) -> str:
+    """Flatten timed transcript segments back into one plain‑text string."""
+    return " ".join(seg["text"] for seg in segments).strip()
+
+
+def _segments_from_alternatives(alternatives) -> List[Dict[str, Any]]:
+    """
+    Turn best‑alternative transcripts (with word time offsets) into
+    ``{"start", "end", "text"}`` segments, times in seconds.
+    """
+    segments = []
+    for alt in alternatives:
+        words = list(alt.words)
+        segments.append(
+            {
+                "start": words[0].start_time.total_seconds() if words else None,
+                "end":   words[-1].end_time.total_seconds() if words else None,
+                "text":  alt.transcript.strip(),
+            }
+        )
+    return segments
+
+
+def _fitz_page_text(page, use_blocks: bool) -> str:
+    """Text of a single PyMuPDF page, either in reading order or as raw blocks."""
+    if use_blocks:
+        # Each block is (x0, y0, x1, y1, text, block_no, block_type)
+        return "\n".join(
+            block[4] for block in page.get_text("blocks") if block[6] == 0   # 0 = text
+        )
+    return page.get_text("text")
+
+
+def _label(source: "FileSource") -> str:
+    """Human‑readable name of a source for warning messages."""
+    return source if isinstance(source, str) else getattr(source, "name", "<in-memory file>")
+
+
+def _open_pdf(pdf: Union[str, bytes]):
+    """Open a PDF from a path or from raw bytes."""
+    if isinstance(pdf, bytes):
+        return fitz.open(stream=pdf, filetype="pdf")
+    return fitz.open(pdf)
+
+
+def _fitz_pages_text(pdf: Union[str, bytes], start: int, stop: int, use_blocks: bool) -> str:
+    """
+    Worker: extract pages ``[start, stop)``.  PyMuPDF documents must not be
+    shared between threads or processes, so every worker opens its own handle.
+    """
+    with _open_pdf(pdf) as doc:
+        return "\n".join(
+            _fitz_page_text(doc.load_page(i), use_blocks) for i in range(start, stop)
+        )
 
-# ---------- DOCX ----------
-import docx
 
-# ---------- PPTX ----------
-from pptx import Presentation
+def _pdfminer_text(pdf: Union[str, bytes], page_numbers=None) -> str:
+    """pdfminer.six extraction from a path or raw bytes."""
+    if isinstance(pdf, bytes):
+        pdf = io.BytesIO(pdf)
+    return pdf_extract_text(pdf, page_numbers=page_numbers)
+
+
+def _pdfminer_pages_text(pdf: Union[str, bytes], start: int, stop: int) -> str:
+    """Worker: pdfminer.six extraction of pages ``[start, stop)``."""
+    return _pdfminer_text(pdf, page_numbers=range(start, stop))
+
+
+def _xml_paragraphs(xml: bytes, ns: str) -> List[str]:
+    """
+    Non‑empty paragraph texts (``<ns:p>`` joined from its ``<ns:t>`` runs) of
+    one OOXML part.  Tabs become ``\t`` and line breaks ``\n``, as
+    python‑docx / python‑pptx render them (``<w:tabs>`` in paragraph
+    properties are tab *stops*, not text).  Paragraphs can nest (DOCX text
+    boxes), so each run is only counted for its innermost paragraph, and
+    ``mc:Fallback`` copies of a text box are skipped.
+    """
+    p_tag, t_tag, stops_tag = ns + "p", ns + "t", ns + "tabs"
+    specials = {ns + "tab": "\t", ns + "br": "\n", ns + "cr": "\n"}
+    paragraphs = []
+    for p in etree.fromstring(xml).iter(p_tag):
+        if next(p.iterancestors(_MC_FALLBACK), None) is not None:
+            continue
+        text = "".join(
+            (t.text or "") if t.tag == t_tag else specials[t.tag]
+            for t in p.iter(t_tag, *specials)
+            if next(t.iterancestors(p_tag)) is p and t.getparent().tag != stops_tag
+        ).strip()
+        if text:
+            paragraphs.append(text)
+    return paragraphs
+
+
+def _pptx_slide_parts(zf: zipfile.ZipFile) -> List[str]:
+    """
+    Slide part names in presentation order – ``p:sldIdLst`` in
+    ``ppt/presentation.xml``, resolved through its relationships, as
+    python‑pptx does.  Falls back to ``slideN.xml`` numbering when the
+    presentation part or its relationships are missing.
+    """
+    names = set(zf.namelist())
+    try:
+        presentation = etree.fromstring(zf.read("ppt/presentation.xml"))
+        rels = etree.fromstring(zf.read("ppt/_rels/presentation.xml.rels"))
+    except KeyError:
+        numbered = sorted(
+            (int(m.group(1)), name) for name in names if (m := _SLIDE_RE.fullmatch(name))
+        )
+        return [name for _, name in numbered]
+    targets = {
+        rel.get("Id"): rel.get("Target") for rel in rels.iter(_REL_NS + "Relationship")
+    }
+    parts = []
+    for sld_id in presentation.iter(_P_NS + "sldId"):
+        target = targets.get(sld_id.get(_R_NS + "id"))
+        if target is None:
+            continue
+        # Targets are relative to ppt/ unless they start with "/"
+        part = target.lstrip("/") if target.startswith("/") else posixpath.normpath(
+            posixpath.join("ppt", target)
+        )
+        if part in names:
+            parts.append(part)
+    return parts
+
+
+def _pdfium_text(pdf: Union[str, bytes]) -> str:
+    """pypdfium2 extraction from a path or raw bytes."""
+    doc = pdfium.PdfDocument(pdf)
+    try:
+        return "\n".join(
+            doc[i].get_textpage().get_text_range() for i in range(len(doc))
+        )
+    finally:
+        doc.close()
+
+
+def _page_ranges(page_count: int, workers: int) -> List[Tuple[int, int]]:
+    """Split ``page_count`` pages into at most ``workers`` contiguous ranges."""
+    step = -(-page_count // workers)                # ceil division
+    return [(i, min(i + step, page_count)) for i in range(0, page_count, step)]
 
 
 class DataExtractor:
@@ -38,158 +241,371 @@ class DataExtractor:
     built‑in extractors.
     """
 
-    def __init__(self, project_id: str, processor_id: str):
+    def __init__(
+        self,
+        project_id: str,
+        processor_id: str,
+        pdf_workers: Optional[int] = None,
+    ):
         self.project_id = project_id
         self.processor_id = processor_id
+        # Processes used for page‑parallel PDF extraction (1 = always serial).
+        self.pdf_workers = pdf_workers or PDF_MAX_WORKERS
 
-        # Clients are cheap to create; we keep a single instance per extractor.
-        self.storage_client = storage.Client()
-        self.speech_client  = speech.SpeechClient()
-        self.video_client   = videointelligence.VideoIntelligenceServiceClient()
+    # ------------------------------------------------------------------
+    # GCP clients – cheap to create, we keep a single instance per extractor.
+    # Built lazily on first use: parse‑only copies of the extractor running in
+    # worker processes never open a channel, and no client has to survive a
+    # fork.
+    # ------------------------------------------------------------------
+    @cached_property
+    def storage_client(self) -> storage.Client:
+        return storage.Client()
+
+    @cached_property
+    def speech_client(self) -> speech.SpeechClient:
+        return speech.SpeechClient()
+
+    @cached_property
+    def video_client(self) -> videointelligence.VideoIntelligenceServiceClient:
+        return videointelligence.VideoIntelligenceServiceClient()
 
     # ------------------------------------------------------------------
-    # Utility – download a GCS URI into a temporary local file and return its path.
-    # The caller must delete the temporary file when done (we use `with` blocks).
+    # Utility – download GCS objects straight into memory.  Every local‑parse
+    # extractor accepts a file object, so there is no need to write the blob
+    # to disk only to read it straight back.
     # ------------------------------------------------------------------
-    def _download_to_temp(self, gcs_uri: str) -> str:
-        """
-        Returns the absolute path of a temporary file that contains the
-        downloaded GCS object.  Caller should use `with tempfile.NamedTemporaryFile(...) as tmp:`
-        to guarantee cleanup.
-        """
+    def _download_to_bytes(self, gcs_uri: str) -> io.BytesIO:
+        """Download a single GCS object into an in‑memory buffer."""
+        buf = io.BytesIO()
+        self._blob(gcs_uri).download_to_file(buf, checksum=DOWNLOAD_CHECKSUM)
+        buf.seek(0)
+        return buf
+
+    def _download_to_path(self, gcs_uri: str, path: str) -> str:
+        """Stream a single GCS object to ``path`` and return it."""
+        self._blob(gcs_uri).download_to_filename(path, checksum=DOWNLOAD_CHECKSUM)
+        return path
+
+    def _blob(self, gcs_uri: str) -> storage.Blob:
+        bucket_name, object_name = self._parse_gcs_uri(gcs_uri)
+        return self.storage_client.bucket(bucket_name).blob(object_name)
+
+    @staticmethod
+    def _parse_gcs_uri(gcs_uri: str) -> Tuple[str, str]:
+        """Split ``gs://bucket/path/to/object`` into ``(bucket, path/to/object)``."""
         if not gcs_uri.startswith("gs://"):
             raise ValueError(f"Invalid GCS URI: {gcs_uri}")
 
-        # Parse bucket & object name
         _, _, bucket_name, *object_parts = gcs_uri.split("/")
-        object_name = "/".join(object_parts)
+        return bucket_name, "/".join(object_parts)
 
-        bucket = self.storage_client.bucket(bucket_name)
-        blob   = bucket.blob(object_name)
+    # ------------------------------------------------------------------
+    # Audio / video – batch transcription into timed segments
+    # ------------------------------------------------------------------
+    def transcribe_media_many(self, gcs_uris: List[str]) -> List[List[Dict[str, Any]]]:
+        """
+        Transcribe several audio and/or video files at once.  Both APIs run
+        transcription as server‑side long‑running operations, so every
+        operation is started up front and all of them are awaited in
+        parallel – a batch takes as long as its longest recording, not the
+        sum of them.
 
-        # Create a NamedTemporaryFile that will be manually closed later
-        tmp_file = tempfile.NamedTemporaryFile(delete=False)
-        try:
-            blob.download_to_filename(tmp_file.name)
-        finally:
-            tmp_file.close()                # keep the file on disk
-        return tmp_file.name
+        Returns one list of ``{"start", "end", "text"}`` segments per URI, in
+        order – an empty list where transcription failed.
+        """
+        def kind(gcs_uri: str) -> str:
+            is_video = os.path.splitext(gcs_uri)[1].lower() in VIDEO_EXTENSIONS
+            return "Video" if is_video else "Audio"
+
+        operations = []
+        for gcs_uri in gcs_uris:
+            try:
+                start = (
+                    self._start_video_transcription
+                    if kind(gcs_uri) == "Video"
+                    else self._start_audio_transcription
+                )
+                operations.append(start(gcs_uri))
+            except Exception as e:
+                print(f"[DataExtractor] {kind(gcs_uri)} transcription failed for {gcs_uri}: {e}")
+                operations.append(None)
+
+        def wait(gcs_uri: str, operation) -> List[Dict[str, Any]]:
+            if operation is None:
+                return []
+            try:
+                response = operation.result(timeout=MEDIA_TIMEOUT)
+                if kind(gcs_uri) == "Video":
+                    return self._video_segments(response)
+                return self._audio_segments(response)
+            except Exception as e:
+                print(f"[DataExtractor] {kind(gcs_uri)} transcription failed for {gcs_uri}: {e}")
+                return []
+
+        with ThreadPoolExecutor(max_workers=MEDIA_MAX_WORKERS) as pool:
+            return list(pool.map(wait, gcs_uris, operations))
 
     # ------------------------------------------------------------------
-    # 1️⃣ Audio → Speech‑to‑Text
+    # 1️⃣ Audio → Speech‑to‑Text (long‑running recognize)
     # ------------------------------------------------------------------
     def extract_from_audio(self, gcs_uri: str) -> str:
         """Transcribe an audio file stored in GCS."""
-        try:
-            # Guess encoding from extension – fallback to UNSPECIFIED
-            ext = os.path.splitext(gcs_uri)[1].lower()
-            encoding_map = {
-                ".wav": speech.RecognitionConfig.AudioEncoding.LINEAR16,
-                ".flac": speech.RecognitionConfig.AudioEncoding.FLAC,
-                ".mp3": speech.RecognitionConfig.AudioEncoding.MP3,
-                ".m4a": speech.RecognitionConfig.AudioEncoding.MP4,
-            }
-            encoding = encoding_map.get(
-                ext, speech.RecognitionConfig.AudioEncoding.ENCODING_UNSPECIFIED
-            )
+        return segments_to_text(self.transcribe_media_many([gcs_uri])[0])
 
-            audio = speech.RecognitionAudio(uri=gcs_uri)
-            config = speech.RecognitionConfig(
-                encoding=encoding,
-                language_code="en-US",
-                enable_automatic_punctuation=True,
-            )
-            response = self.speech_client.recognize(config=config, audio=audio)
+    def _start_audio_transcription(self, gcs_uri: str):
+        """Kick off a long‑running recognize operation and return it (non‑blocking)."""
+        # Guess encoding from extension – fallback to UNSPECIFIED
+        ext = os.path.splitext(gcs_uri)[1].lower()
+        encoding_map = {
+            ".wav": speech.RecognitionConfig.AudioEncoding.LINEAR16,
+            ".flac": speech.RecognitionConfig.AudioEncoding.FLAC,
+            ".mp3": speech.RecognitionConfig.AudioEncoding.MP3,
+            ".m4a": speech.RecognitionConfig.AudioEncoding.MP4,
+        }
+        encoding = encoding_map.get(
+            ext, speech.RecognitionConfig.AudioEncoding.ENCODING_UNSPECIFIED
+        )
 
-            transcripts = [
-                result.alternatives[0].transcript for result in response.results
-            ]
-            return " ".join(transcripts).strip()
-        except Exception as e:
-            print(f"[DataExtractor] Audio transcription failed for {gcs_uri}: {e}")
-            return ""
+        audio = speech.RecognitionAudio(uri=gcs_uri)
+        config = speech.RecognitionConfig(
+            encoding=encoding,
+            language_code="en-US",
+            enable_automatic_punctuation=True,
+            enable_word_time_offsets=True,
+        )
+        return self.speech_client.long_running_recognize(config=config, audio=audio)
+
+    @staticmethod
+    def _audio_segments(response) -> List[Dict[str, Any]]:
+        return _segments_from_alternatives(
+            result.alternatives[0] for result in response.results if result.alternatives
+        )
 
     # ------------------------------------------------------------------
     # 2️⃣ Video → Speech transcription (Video Intelligence API)
     # ------------------------------------------------------------------
     def extract_from_video(self, gcs_uri: str) -> str:
         """Transcribe spoken words from a video stored in GCS."""
-        try:
-            features = [videointelligence.Feature.SPEECH_TRANSCRIPTION]
-            operation = self.video_client.annotate_video(
-                request={"features": features, "input_uri": gcs_uri}
-            )
-            result = operation.result(timeout=300)
+        return segments_to_text(self.transcribe_media_many([gcs_uri])[0])
 
-            transcripts = []
-            for annotation_result in result.annotation_results:
-                for speech_transcription in annotation_result.speech_transcriptions:
-                    best_alt = speech_transcription.alternatives[0]
-                    transcripts.append(best_alt.transcript)
+    def _start_video_transcription(self, gcs_uri: str):
+        """Kick off a speech‑transcription annotate_video operation (non‑blocking)."""
+        features = [videointelligence.Feature.SPEECH_TRANSCRIPTION]
+        video_context = videointelligence.VideoContext(
+            speech_transcription_config=videointelligence.SpeechTranscriptionConfig(
+                language_code="en-US",
+                enable_automatic_punctuation=True,
+            )
+        )
+        return self.video_client.annotate_video(
+            request={
+                "features": features,
+                "input_uri": gcs_uri,
+                "video_context": video_context,
+            }
+        )
 
-            return " ".join(transcripts).strip()
-        except Exception as e:
-            print(f"[DataExtractor] Video transcription failed for {gcs_uri}: {e}")
-            return ""
+    @staticmethod
+    def _video_segments(response) -> List[Dict[str, Any]]:
+        # One speech_transcription per utterance; put them back in time order.
+        segments = _segments_from_alternatives(
+            transcription.alternatives[0]
+            for annotation_result in response.annotation_results
+            for transcription in annotation_result.speech_transcriptions
+            if transcription.alternatives
+        )
+        return sorted(segments, key=lambda seg: seg["start"] if seg["start"] is not None else 0.0)
 
     # ------------------------------------------------------------------
-    # 3️⃣ PDF → plain text (pdfminer.six)
+    # 3️⃣ PDF → plain text (PyMuPDF, pdfminer.six as a fallback)
     # ------------------------------------------------------------------
-    def extract_from_pdf(self, local_path: str) -> str:
-        """Read a PDF file (already downloaded locally) and return its text."""
+    def extract_from_pdf(self, source: FileSource, use_blocks: bool = False) -> str:
+        """
+        Read a PDF (local path or in‑memory file object) and return its text.
+
+        ``use_blocks=True`` asks PyMuPDF for raw text blocks instead of the
+        reading-order "text" output – cheaper on scanned / image-heavy PDFs
+        where the layout analysis buys nothing.
+
+        Documents with at least ``PDF_PARALLEL_MIN_PAGES`` pages are split into
+        page ranges and extracted in a process pool.  Processes rather than
+        threads: PyMuPDF is not thread-safe and pdfminer is pure Python, so
+        neither would scale under the GIL.
+
+        The pdfminer fallback always runs in child processes with a hard
+        ``PDFMINER_TIMEOUT``, so one pathological file cannot stall a whole
+        bucket load; if it times out or fails, pypdfium2 is tried last.
+        """
+        # Raw bytes (unlike an open file object) can be shipped to pool workers.
+        pdf = source if isinstance(source, str) else source.read()
+        label = _label(source)
+
+        page_count = None
         try:
-            return pdf_extract_text(local_path).strip()
+            with _open_pdf(pdf) as doc:
+                page_count = doc.page_count
+                if not self._parallel_pdf(page_count):
+                    return "\n".join(
+                        _fitz_page_text(page, use_blocks) for page in doc
+                    ).strip()
+            return self._map_page_ranges(
+                _fitz_pages_text, pdf, page_count, use_blocks
+            ).strip()
         except Exception as e:
-            print(f"[DataExtractor] PDF extraction failed for {local_path}: {e}")
+            print(f"[DataExtractor] PyMuPDF failed for {label}: {e} – trying pdfminer")
+
+        try:
+            return self._pdfminer_bounded(pdf, page_count).strip()
+        except multiprocessing.TimeoutError:
+            print(
+                f"[DataExtractor] pdfminer timed out after {PDFMINER_TIMEOUT}s "
+                f"for {label} – trying pypdfium2"
+            )
+        except Exception as e:
+            print(f"[DataExtractor] pdfminer failed for {label}: {e} – trying pypdfium2")
+
+        try:
+            return _pdfium_text(pdf).strip()
+        except Exception as e:
+            print(f"[DataExtractor] PDF extraction failed for {label}: {e}")
             return ""
 
+    def _pdfminer_bounded(self, pdf: Union[str, bytes], page_count: Optional[int]) -> str:
+        """pdfminer.six in child processes; raises ``multiprocessing.TimeoutError``."""
+        if page_count is not None and self._parallel_pdf(page_count):
+            return self._map_page_ranges(
+                _pdfminer_pages_text, pdf, page_count, timeout=PDFMINER_TIMEOUT
+            )
+        with MP_CONTEXT.Pool(processes=1) as pool:     # exit → terminate()
+            return pool.apply_async(_pdfminer_text, (pdf,)).get(PDFMINER_TIMEOUT)
+
+    def _parallel_pdf(self, page_count: int) -> bool:
+        return self.pdf_workers > 1 and page_count >= PDF_PARALLEL_MIN_PAGES
+
+    def _map_page_ranges(
+        self,
+        worker: Callable[..., str],
+        pdf: Union[str, bytes],
+        page_count: int,
+        *args,
+        timeout: Optional[float] = None,
+    ) -> str:
+        """
+        Run ``worker(pdf, start, stop, *args)`` per page range in a process
+        pool and join the results in page order.  After ``timeout`` seconds the
+        workers are killed (a Pool's exit terminates them, unlike an executor's)
+        and ``multiprocessing.TimeoutError`` is raised.
+        """
+        ranges = _page_ranges(page_count, self.pdf_workers)
+        with MP_CONTEXT.Pool(processes=len(ranges)) as pool:
+            parts = pool.starmap_async(
+                worker, [(pdf, start, stop, *args) for start, stop in ranges]
+            ).get(timeout)
+        return "\n".join(parts)
+
     # ------------------------------------------------------------------
-    # 4️⃣ DOCX → plain text (python-docx)
+    # 4️⃣ DOCX → plain text (word/document.xml)
     # ------------------------------------------------------------------
-    def extract_from_docx(self, local_path: str) -> str:
-        """Read a .docx file and return its text."""
+    def extract_from_docx(self, source: FileSource) -> str:
+        """Read a .docx file (path or file object) and return its text."""
         try:
-            doc = docx.Document(local_path)
-            paragraphs = [p.text for p in doc.paragraphs if p.text.strip()]
-            return "\n".join(paragraphs).strip()
+            with zipfile.ZipFile(source) as zf:
+                xml = zf.read("word/document.xml")
+            return "\n".join(_xml_paragraphs(xml, _W_NS)).strip()
         except Exception as e:
-            print(f"[DataExtractor] DOCX extraction failed for {local_path}: {e}")
+            print(f"[DataExtractor] DOCX extraction failed for {_label(source)}: {e}")
             return ""
 
     # ------------------------------------------------------------------
-    # 5️⃣ PPTX → plain text (python-pptx)
+    # 5️⃣ PPTX → plain text (ppt/slides/slide*.xml)
     # ------------------------------------------------------------------
-    def extract_from_pptx(self, local_path: str) -> str:
-        """Read a .pptx file and return its text."""
+    def extract_from_pptx(self, source: FileSource) -> str:
+        """Read a .pptx file (path or file object) and return its text."""
         try:
-            prs = Presentation(local_path)
             texts = []
-            for slide in prs.slides:
-                for shape in slide.shapes:
-                    if hasattr(shape, "text") and shape.text.strip():
-                        texts.append(shape.text.strip())
+            with zipfile.ZipFile(source) as zf:
+                for name in _pptx_slide_parts(zf):
+                    texts.extend(_xml_paragraphs(zf.read(name), _A_NS))
             return "\n".join(texts).strip()
         except Exception as e:
-            print(f"[DataExtractor] PPTX extraction failed for {local_path}: {e}")
+            print(f"[DataExtractor] PPTX extraction failed for {_label(source)}: {e}")
             return ""
 
     # ------------------------------------------------------------------
     # 6️⃣ TXT → plain text (just read the file)
     # ------------------------------------------------------------------
-    def extract_from_txt(self, local_path: str) -> str:
-        """Read a plain‑text .txt file (UTF‑8) and return its content."""
+    def extract_from_txt(self, source: FileSource) -> str:
+        """
+        Read a plain‑text .txt file (UTF‑8, path or file object) and return its
+        content.  Files on disk are memory‑mapped and decoded straight from
+        the mapping, so the raw bytes are never copied into a Python object
+        first; undecodable bytes become U+FFFD instead of losing the file.
+        """
         try:
-            with open(local_path, "r", encoding="utf-8") as f:
-                return f.read().strip()
+            if isinstance(source, str):
+                if os.path.getsize(source) == 0:      # mmap rejects empty files
+                    return ""
+                with open(source, "rb") as f, \
+                     mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    return str(mm, "utf-8", errors="replace").strip()
+            if isinstance(source, io.BytesIO):
+                # getbuffer() is a zero‑copy view of the in‑memory download
+                with source.getbuffer() as view:
+                    return str(view, "utf-8", errors="replace").strip()
+            return source.read().decode("utf-8", errors="replace").strip()
         except Exception as e:
-            print(f"[DataExtractor] TXT extraction failed for {local_path}: {e}")
+            print(f"[DataExtractor] TXT extraction failed for {_label(source)}: {e}")
             return ""
 
     # ------------------------------------------------------------------
     # Public API – these signatures are exactly what GenAIDocumentAssistant
     # calls.  No dispatcher, no recursion.
     # ------------------------------------------------------------------
-    # (Audio & video already accept a GCS URI; PDF/DOCX/PPTX/TXT accept a local path)
+    # (Audio & video already accept a GCS URI; PDF/DOCX/PPTX/TXT accept a local
+    #  path or an in‑memory file object)
 
     # keep the method names unchanged – the body simply calls the implementation above
     # (the “_” helpers have been merged into the methods themselves)
+
+
+# ------------------------------------------------------------------
+# Parse‑pool worker side.  This module is all a worker process imports
+# (not the assistant with its Vertex AI / scipy stack).  Every worker
+# builds one DataExtractor (via the pool initializer) and reuses it for
+# all files it is handed.
+#   _LOCAL – extension → (content type, DataExtractor method)
+# ------------------------------------------------------------------
+_LOCAL: Dict[str, Tuple[str, str]] = {
+    "pdf":  ("PDF Document", "extract_from_pdf"),
+    "docx": ("Word Document", "extract_from_docx"),
+    "pptx": ("PowerPoint Presentation", "extract_from_pptx"),
+    "txt":  ("Plain Text", "extract_from_txt"),
+}
+
+
+_worker_extractor: Optional[DataExtractor] = None
+
+
+def _init_parse_worker(project_id: str, processor_id: str) -> None:
+    global _worker_extractor
+    # Files are already spread across processes – keep each PDF serial.
+    _worker_extractor = DataExtractor(project_id, processor_id, pdf_workers=1)
+
+
+def _parse_in_worker(file_ext: str, source: Union[bytes, str]) -> Tuple[str, str]:
+    """Parse downloaded bytes, or the path of a blob spooled to disk."""
+    if isinstance(source, bytes):
+        source = io.BytesIO(source)
+    return _extract_local(_worker_extractor, file_ext, source)
+
+
+def _extract_local(extractor: DataExtractor, file_ext: str, buf) -> Tuple[str, str]:
+    """Dispatch a downloaded PDF / DOCX / PPTX / TXT buffer to its extractor."""
+    content_type, method = _LOCAL[file_ext]
+    return getattr(extractor, method)(buf), content_type
+
+
+def _download_text(extractor: DataExtractor, gcs_uri: str) -> Tuple[str, str]:
+    """Fetch + decode a .txt blob in one step – nothing to parse."""
+    return _extract_local(extractor, "txt", extractor._download_to_bytes(gcs_uri))
@@ -83,10 +83,11 @@ def main():
         # Generate assistant response
         with st.chat_message("assistant"):
             with st.spinner("🔍 Searching documents and generating answer..."):
-                answer = assistant.ask_question(prompt)
-                st.markdown(answer["answer"])
+                # Stream the answer so it renders as soon as Gemini starts replying
+                answer = assistant.ask_question(prompt, stream=True)
+                answer_text = st.write_stream(answer["answer"])
                 st.session_state.messages.append(
-                    {"role": "assistant", "content": answer["answer"]}
+                    {"role": "assistant", "content": answer_text}
                 )
 
                 # Expandable context and sources
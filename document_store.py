@@ -0,0 +1,277 @@
+# --------------------------------------------------------------
+# document_store.py
+# --------------------------------------------------------------
+"""
+``name → text`` mappings for extracted documents.
+
+``DocumentStore`` is disk‑backed: each document is appended to a flat file
+twice – as UTF‑8 and as lowercased UTF‑8 (for case‑insensitive search) – and
+a small SQLite table records where each copy lives.  Reads and searches
+slice a memory map of the flat file, so resident memory holds only the
+pages actually touched plus a short LRU of decoded documents, not the whole
+corpus.
+
+Every store gets a fresh private directory under ``root`` (removed when the
+store is garbage‑collected): documents are re‑extracted on each load, and
+nothing from another process's corpus should ever show up here.  ``root``
+must be on a real disk – on a tmpfs (Cloud Run's ``/tmp``, for one) the
+"disk‑backed" corpus is more resident than a dict of strings.
+
+``MemoryDocumentStore`` is the same interface over a plain dict, for when
+no real disk is available: one copy of each text, searched in place.
+"""
+
+import mmap
+import os
+import re
+import shutil
+import sqlite3
+import tempfile
+import threading
+import weakref
+from collections.abc import MutableMapping
+from functools import lru_cache
+from typing import Dict, Iterator, Optional, Tuple
+
+
+# Fully decoded documents kept in memory (snippets, repeated reads).
+DOC_CACHE_SIZE = 32
+
+# Let SQLite memory‑map its own (small) index file as well.
+SQLITE_MMAP_SIZE = 64 * 1024 * 1024
+
+# A UTF‑8 character is at most this many bytes – bounds prefix reads.
+_MAX_UTF8_BYTES = 4
+
+
+class DocumentStore(MutableMapping):
+    def __init__(self, root: str):
+        os.makedirs(root, exist_ok=True)
+        self._dir = tempfile.mkdtemp(prefix="documents-", dir=root)
+        self._finalizer = weakref.finalize(self, shutil.rmtree, self._dir, True)
+
+        self._lock = threading.Lock()     # queries run on worker threads too
+        self._db = sqlite3.connect(
+            os.path.join(self._dir, "documents.sqlite"), check_same_thread=False
+        )
+        self._db.execute(f"PRAGMA mmap_size={SQLITE_MMAP_SIZE}")
+        self._db.execute(
+            """CREATE TABLE docs (
+                   name         TEXT PRIMARY KEY,
+                   offset       INTEGER NOT NULL,
+                   length       INTEGER NOT NULL,
+                   lower_offset INTEGER NOT NULL,
+                   lower_length INTEGER NOT NULL,
+                   chars        INTEGER NOT NULL
+               )"""
+        )
+        self._data = open(os.path.join(self._dir, "documents.bin"), "a+b")
+        self._mm: Optional[mmap.mmap] = None      # remapped lazily after writes
+        self._decode = lru_cache(maxsize=DOC_CACHE_SIZE)(self._decode_uncached)
+        self._generation = 0    # bumped by every write
+
+    # ------------------------------------------------------------------
+    # Mapping protocol
+    # ------------------------------------------------------------------
+    def __setitem__(self, name: str, text: str) -> None:
+        raw, raw_lc = text.encode("utf-8"), text.lower().encode("utf-8")
+        with self._lock:
+            self._data.seek(0, os.SEEK_END)
+            offset = self._data.tell()
+            self._data.write(raw)
+            self._data.write(raw_lc)
+            self._data.flush()
+            self._mm = None
+            # UPSERT keeps the original rowid, i.e. dict‑like insertion order
+            self._db.execute(
+                """INSERT INTO docs VALUES (?, ?, ?, ?, ?, ?)
+                   ON CONFLICT(name) DO UPDATE SET
+                       offset=excluded.offset, length=excluded.length,
+                       lower_offset=excluded.lower_offset,
+                       lower_length=excluded.lower_length, chars=excluded.chars""",
+                (name, offset, len(raw), offset + len(raw), len(raw_lc), len(text)),
+            )
+            self._db.commit()
+            self._generation += 1
+        # No cache invalidation: appended bytes never reuse an (offset, length)
+
+    def __getitem__(self, name: str) -> str:
+        offset, length, _, _, _ = self._row(name)
+        return self._decode(offset, length)
+
+    def __delitem__(self, name: str) -> None:
+        with self._lock:
+            if self._db.execute("DELETE FROM docs WHERE name = ?", (name,)).rowcount == 0:
+                raise KeyError(name)
+            self._db.commit()
+            self._generation += 1
+
+    def __iter__(self) -> Iterator[str]:
+        with self._lock:
+            names = [n for (n,) in self._db.execute("SELECT name FROM docs ORDER BY rowid")]
+        return iter(names)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM docs").fetchone()[0]
+
+    def __contains__(self, name: object) -> bool:
+        with self._lock:
+            return self._db.execute(
+                "SELECT 1 FROM docs WHERE name = ?", (name,)
+            ).fetchone() is not None
+
+    def clear(self) -> None:
+        with self._lock:
+            self._db.execute("DELETE FROM docs")
+            self._db.commit()
+            self._mm = None
+            self._data.truncate(0)
+            self._generation += 1
+        self._decode.cache_clear()
+
+    @property
+    def generation(self) -> int:
+        """Changes whenever a document is added, replaced or removed."""
+        return self._generation
+
+    # ------------------------------------------------------------------
+    # Partial reads – no full decode of the document
+    # ------------------------------------------------------------------
+    def read(self, name: str, max_chars: int) -> str:
+        """The first ``max_chars`` characters of a document."""
+        return self.read_range(name, 0, max_chars)
+
+    def read_range(self, name: str, start: int, end: int) -> str:
+        """Characters ``[start, end)`` of a document (clamped like a slice)."""
+        offset, length, _, _, chars = self._row(name)
+        start, end = max(start, 0), min(end, chars)
+        if start >= end:
+            return ""
+        if length == chars:
+            # ASCII: characters are bytes, slice just the window
+            return self._view(offset + start, end - start).decode("ascii")
+        if start == 0:
+            n_bytes = min(length, end * _MAX_UTF8_BYTES)
+            # errors="ignore": the byte window may end mid‑character
+            return self._view(offset, n_bytes).decode("utf-8", errors="ignore")[:end]
+        return self._decode(offset, length)[start:end]
+
+    def lower(self, name: str) -> str:
+        """The lowercased text of a document."""
+        _, _, lower_offset, lower_length, _ = self._row(name)
+        return self._view(lower_offset, lower_length).decode("utf-8")
+
+    def find_lower(self, name: str, term_lc: str) -> int:
+        """
+        Character index of ``term_lc`` in the lowercased document, or -1 –
+        ``mmap.find`` over the stored lowercased bytes, nothing decoded
+        unless a non‑ASCII document has a hit.
+        """
+        _, length, lower_offset, lower_length, chars = self._row(name)
+        if not lower_length:
+            return 0 if not term_lc else -1
+        mm = self._map()
+        idx = mm.find(term_lc.encode("utf-8"), lower_offset, lower_offset + lower_length)
+        if idx == -1:
+            return -1
+        if length == chars:
+            return idx - lower_offset        # ASCII: bytes are characters
+        return len(mm[lower_offset:idx].decode("utf-8"))
+
+    def chars(self, name: str) -> int:
+        """Length of a document in characters, without reading it."""
+        return self._row(name)[4]
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+    def _row(self, name: str) -> Tuple[int, int, int, int, int]:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT offset, length, lower_offset, lower_length, chars "
+                "FROM docs WHERE name = ?",
+                (name,),
+            ).fetchone()
+        if row is None:
+            raise KeyError(name)
+        return row
+
+    def _map(self) -> mmap.mmap:
+        with self._lock:
+            if self._mm is None:
+                self._mm = mmap.mmap(self._data.fileno(), 0, access=mmap.ACCESS_READ)
+            return self._mm
+
+    def _view(self, offset: int, length: int) -> bytes:
+        if not length:
+            return b""
+        return self._map()[offset:offset + length]
+
+    def _decode_uncached(self, offset: int, length: int) -> str:
+        return self._view(offset, length).decode("utf-8")
+
+
+class MemoryDocumentStore(MutableMapping):
+    def __init__(self):
+        self._docs: Dict[str, str] = {}
+        self._generation = 0    # bumped by every write
+
+    # ------------------------------------------------------------------
+    # Mapping protocol
+    # ------------------------------------------------------------------
+    def __setitem__(self, name: str, text: str) -> None:
+        self._docs[name] = text
+        self._generation += 1
+
+    def __getitem__(self, name: str) -> str:
+        return self._docs[name]
+
+    def __delitem__(self, name: str) -> None:
+        del self._docs[name]
+        self._generation += 1
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(list(self._docs))
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._docs
+
+    def clear(self) -> None:
+        self._docs.clear()
+        self._generation += 1
+
+    @property
+    def generation(self) -> int:
+        """Changes whenever a document is added, replaced or removed."""
+        return self._generation
+
+    # ------------------------------------------------------------------
+    # Same partial reads as DocumentStore
+    # ------------------------------------------------------------------
+    def read(self, name: str, max_chars: int) -> str:
+        """The first ``max_chars`` characters of a document."""
+        return self.read_range(name, 0, max_chars)
+
+    def read_range(self, name: str, start: int, end: int) -> str:
+        """Characters ``[start, end)`` of a document (clamped like a slice)."""
+        return self._docs[name][max(start, 0):max(end, 0)]
+
+    def lower(self, name: str) -> str:
+        """The lowercased text of a document."""
+        return self._docs[name].lower()
+
+    def find_lower(self, name: str, term_lc: str) -> int:
+        """
+        Character index of ``term_lc`` in the lowercased document, or -1 –
+        a case‑insensitive scan of the text itself, with no lowercased copy.
+        """
+        match = re.search(re.escape(term_lc), self._docs[name], re.IGNORECASE)
+        return -1 if match is None else match.start()
+
+    def chars(self, name: str) -> int:
+        """Length of a document in characters."""
+        return len(self._docs[name])
@@ -3,15 +3,30 @@
 # --------------------------------------------------------------
 #cat > genai_document_assistant.py << 'EOF'
 import os
+import re
 import json
+import asyncio
+import hashlib
 import tempfile
-from datetime import datetime
-from typing import List, Dict, Any
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from functools import cached_property, lru_cache
+from typing import List, Dict, Any, AsyncIterator, Callable, Iterator, Optional, Tuple, Union
+
+import numpy as np
+from scipy import sparse
 
 # GCP clients
 from google.cloud import storage
 import vertexai
-from vertexai.generative_models import GenerativeModel
+from vertexai.caching import CachedContent
+from vertexai.generative_models import GenerationConfig, GenerativeModel
+from vertexai.language_models import TextEmbeddingModel
+
+# Persistent response cache (survives app restarts / Cloud Run cold starts)
+import diskcache
 
 
 # ------------------------------------------------------------------
@@ -20,12 +35,136 @@ from vertexai.generative_models import GenerativeModel
 # Expected public methods (all return plain‑text strings):
 #   - extract_from_audio(gcs_uri)
 #   - extract_from_video(gcs_uri)
-#   - extract_from_pdf(local_path)
-#   - extract_from_docx(local_path)
-#   - extract_from_pptx(local_path)
-#   - extract_from_txt(local_path)   # added for plain‑text files
+#   - extract_from_pdf(source)    # source = local path or file object
+#   - extract_from_docx(source)
+#   - extract_from_pptx(source)
+#   - extract_from_txt(source)   # added for plain‑text files
+# ------------------------------------------------------------------
+from data_extractor import (   # <-- make sure this exists in PYTHONPATH
+    DataExtractor,
+    MP_CONTEXT,
+    segments_to_text,
+    _LOCAL,
+    _download_text,
+    _init_parse_worker,
+    _parse_in_worker,
+)
+from document_store import DocumentStore, MemoryDocumentStore
+from semantic_cache import SemanticCache
+
+
+# ------------------------------------------------------------------
+# Ingestion pipeline tuning: downloads (network, threads) and parsing
+# (CPU + GIL‑bound, processes) run concurrently, connected by a bounded
+# queue so at most PIPELINE_QUEUE_SIZE downloaded‑but‑unparsed blobs sit
+# in memory.  Blobs above DOWNLOAD_SPOOL_BYTES are streamed to a temp file
+# (under TMPDIR) and parsed from its path instead, so a few huge objects
+# can't multiply that bound.
+# ------------------------------------------------------------------
+DOWNLOAD_CONCURRENCY = 16
+PARSE_WORKERS        = (
+    len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else os.cpu_count() or 1
+)   # CPUs this process may be scheduled on (taskset / cpusets); CPU quotas
+    # such as Cloud Run vCPUs or `docker --cpus` are not visible here
+PIPELINE_QUEUE_SIZE  = 8
+DOWNLOAD_SPOOL_BYTES = 8 * 1024 * 1024
+
+# Gemini calls kept in flight at once by ask_questions() and
+# get_document_summary() – each is one network‑bound request on a shared
+# event loop.
+QUESTION_WORKERS = 8
+
+# Characters of each document sent in its own summary prompt.
+SUMMARY_DOC_CHARS = 6000
+
+# Embeds questions for the semantic answer cache.
+EMBEDDING_MODEL = "text-embedding-004"
+
+# Lifetime of the server‑side corpus cache (use_context_cache=True); it is
+# extended on use once less than CONTEXT_CACHE_REFRESH remains.
+CONTEXT_CACHE_TTL     = timedelta(hours=1)
+CONTEXT_CACHE_REFRESH = timedelta(minutes=5)
+
+# Instructions shared by every question prompt (and by the cached corpus).
+ANSWER_INSTRUCTIONS = """You are an AI assistant that answers questions strictly using the
+documents provided in the CONTEXT section below. Do NOT hallucinate.
+If the answer can't be found, explicitly say so and cite the relevant documents."""
+
+# (cached‑corpus model, CachedContent name) a question was prepared against.
+_CorpusCache = Tuple[GenerativeModel, str]
+
+# Marks the end of a stream stepped on another event loop.
+_STREAM_END = object()
+
+# On‑disk caches live under here unless the constructor says otherwise.
+DEFAULT_CACHE_DIR = os.environ.get("RAG_CACHE_DIR", "/tmp/rag_cache")
+
+# Extracted document text goes to disk only when this names a real disk
+# (e.g. a mounted volume); otherwise it stays in memory.  Never point it at
+# a tmpfs such as Cloud Run's /tmp – the files would count against RAM, twice.
+DEFAULT_DOCUMENT_DIR = os.environ.get("RAG_DOCUMENT_DIR")
+
+# Tokenizer shared by the inverted index and the query side, so both agree.
+# Stopwords and tokens of two characters or fewer carry no ranking signal
+# and are left out of the index on both sides.
+_TOKEN_RE = re.compile(r"\w+")
+_STOPWORDS = frozenset({
+    "the", "and", "for", "are", "but", "not", "you", "all", "any", "can",
+    "had", "her", "was", "one", "our", "out", "has", "his", "how", "its",
+    "who", "did", "yes", "she", "him", "they", "them", "their", "there",
+    "this", "that", "these", "those", "with", "from", "into", "than",
+    "then", "what", "when", "where", "which", "while", "why", "will",
+    "would", "could", "should", "have", "been", "being", "were", "does",
+    "about", "also", "just", "more", "most", "some", "such", "only",
+    "other", "over", "very", "your", "each", "both", "same", "here",
+})
+
+
+def _is_index_token(token: str) -> bool:
+    return len(token) > 2 and token not in _STOPWORDS
+
+# BM25 ranking for create_context_from_documents(): k1 = term‑frequency
+# saturation, b = document‑length normalisation (the usual Okapi defaults).
+# Only the CONTEXT_TOP_K best documents are ranked – the prompt budget is
+# exhausted long before that anyway.
+BM25_K1       = 1.5
+BM25_B        = 0.75
+CONTEXT_TOP_K = 16
+
+
+def _topk(scores: np.ndarray, k: int) -> np.ndarray:
+    """Indices of the (at most) ``k`` highest positive scores, best first –
+    ``argpartition`` picks them without sorting the whole corpus."""
+    positive = np.flatnonzero(scores > 0)
+    if len(positive) > k:
+        positive = positive[np.argpartition(-scores[positive], k - 1)[:k]]
+    return positive[np.argsort(-scores[positive], kind="stable")]
+
+
+# ------------------------------------------------------------------
+# Extension → handler tables, looked up once per blob.
+#   _REMOTE – transcribed server‑side straight from the gs:// URI
+#   _LOCAL  – downloaded, then parsed by the named DataExtractor method
+#             (defined next to the parse‑pool worker in data_extractor)
+# Anything else is skipped without touching the network.
+# ------------------------------------------------------------------
+_REMOTE: Dict[str, str] = {
+    "wav": "Audio Transcript", "mp3": "Audio Transcript",
+    "flac": "Audio Transcript", "m4a": "Audio Transcript",
+    "mp4": "Video Transcript", "avi": "Video Transcript",
+    "mov": "Video Transcript", "mkv": "Video Transcript",
+}
+
+
 # ------------------------------------------------------------------
-from data_extractor import DataExtractor   # <-- make sure this exists in PYTHONPATH
+# Per‑document metadata (one instance per loaded document).
+# ------------------------------------------------------------------
+@dataclass(slots=True)
+class DocMeta:
+    type: str
+    size_chars: int
+    gcs_path: str
+    processed_at: str
 
 
 class GenAIDocumentAssistant:
@@ -39,6 +178,10 @@ class GenAIDocumentAssistant:
         project_id: str,
         processor_id: str,
         location: str = "us-central1",
+        temperature: Optional[float] = None,
+        cache_dir: str = DEFAULT_CACHE_DIR,
+        use_context_cache: bool = False,
+        document_dir: Optional[str] = DEFAULT_DOCUMENT_DIR,
     ):
         self.project_id   = project_id
         self.processor_id = processor_id
@@ -49,7 +192,49 @@ class GenAIDocumentAssistant:
         # ------------------------------------------------------
         vertexai.init(project=self.project_id, location=self.location)
         # You can change this to "gemini-2.5-pro" if you prefer
-        self.model = GenerativeModel("gemini-2.5-flash")
+        self.model_name = "gemini-2.5-flash"
+        self._generation_config = (
+            GenerationConfig(temperature=temperature)
+            if temperature is not None else None
+        )
+        self.model = GenerativeModel(
+            self.model_name, generation_config=self._generation_config
+        )
+
+        # ------------------------------------------------------
+        # Response cache: identical prompt → identical answer, so repeats
+        # skip the Gemini round trip.  In memory (LRU) in front of disk.
+        # Bypassed when sampling is explicitly made non‑deterministic.
+        # ------------------------------------------------------
+        self._cache_responses = temperature is None or temperature <= 0
+        self._response_cache  = diskcache.Cache(os.path.join(cache_dir, "responses"))
+        self._cached_generate = lru_cache(maxsize=512)(self._generate_uncached)
+        # Paraphrased repeats of a recent question reuse its answer too.
+        self._semantic_cache  = SemanticCache()
+
+        # The async Gemini client binds to the event loop it is first used
+        # on, so every async call runs on this one long‑lived loop (on a
+        # daemon thread) rather than on a fresh asyncio.run() loop per call.
+        self._loop = asyncio.new_event_loop()
+        threading.Thread(
+            target=self._loop.run_forever, name="genai-assistant-loop", daemon=True
+        ).start()
+
+        # ------------------------------------------------------
+        # Optional Vertex AI context cache: the whole corpus is uploaded
+        # once per load as a CachedContent, and questions send only
+        # themselves instead of a freshly built CONTEXT section.
+        # ------------------------------------------------------
+        self.use_context_cache = use_context_cache
+        self._cached_content: Optional[CachedContent] = None
+        self._cached_model: Optional[GenerativeModel] = None
+        self._cached_content_expires = datetime.now(timezone.utc)
+        self._cached_corpus_chars = 0
+        self._corpus_cache_lock = threading.Lock()   # questions check it from threads
+
+        # Extracted text per blob content, so a restart only re‑processes
+        # objects whose bytes changed since the last run.
+        self._extraction_cache = diskcache.Cache(os.path.join(cache_dir, "extracted"))
 
         # ------------------------------------------------------
         # Helper services
@@ -58,10 +243,40 @@ class GenAIDocumentAssistant:
         self.storage_client = storage.Client()
 
         # ------------------------------------------------------
-        # In‑memory stores (document → text, and document → metadata)
+        # Stores (document → text, document → metadata in memory).  With a
+        # document_dir the text is memory‑mapped from disk and read on
+        # demand: ranking only needs the index below, and prompts only need
+        # a prefix of each document.
         # ------------------------------------------------------
-        self.document_contents: Dict[str, str] = {}
-        self.document_metadata: Dict[str, Dict[str, Any]] = {}
+        self.document_contents: Union[DocumentStore, MemoryDocumentStore] = (
+            DocumentStore(document_dir) if document_dir else MemoryDocumentStore()
+        )
+        self.document_metadata: Dict[str, DocMeta] = {}
+        # Timed {"start", "end", "text"} segments for audio/video documents,
+        # for retrieval that wants a passage rather than the whole recording.
+        self.document_segments: Dict[str, List[Dict[str, Any]]] = {}
+
+        # Query‑side views of the (static) corpus, rebuilt after every load so
+        # ranking never re‑lowercases or rescans the raw text:
+        #   _doc_names     – doc_id → document name
+        #   _term_ids      – token → term id
+        #   _term_offsets, _post_doc
+        #                  – CSR postings (doc ids per term)
+        #   _bm25          – docs × terms CSC matrix of precomputed BM25
+        #                    weights, sharing the postings layout
+        self._doc_names: List[str] = []
+        self._term_ids: Dict[str, int] = {}
+        self._term_offsets: np.ndarray = np.zeros(1, dtype=np.int64)
+        self._post_doc: np.ndarray = np.zeros(0, dtype=np.int32)
+        self._bm25 = sparse.csc_matrix((0, 0), dtype=np.float32)
+        # Store generation the index was built from (-1: never built)
+        self._index_generation = -1
+
+        # Built contexts per (query, max_context_len), so repeat queries skip
+        # scoring entirely.  Dropped (with the semantic cache) whenever the
+        # store's generation moves – a load, or any direct write.
+        self._context_cache = lru_cache(maxsize=256)(self._build_context)
+        self._answers_generation = self.document_contents.generation
 
     # ------------------------------------------------------------------
     # 1️⃣ Load & extract everything from a bucket
@@ -75,10 +290,51 @@ class GenAIDocumentAssistant:
         print("🔄 Loading documents from GCS…")
         bucket = self.storage_client.bucket(bucket_name)
 
-        # List objects under the `extracted/` prefix
-        blobs = list(bucket.list_blobs(prefix="extracted/"))
+        # List objects under the `extracted/` prefix – only the fields used
+        # below, which keeps listing pages small on large buckets
+        blobs = list(
+            bucket.list_blobs(
+                prefix="extracted/",
+                fields="items(name,generation,crc32c,md5Hash,size),nextPageToken",
+            )
+        )
         print(f"🔎 Found {len(blobs)} objects under prefix 'extracted/'")
 
+        # Blobs whose current content was extracted on an earlier run are
+        # served from the on‑disk cache – no download, no parsing.  (Listing
+        # already returns each blob's checksum; no reload() needed.)
+        cached: Dict[str, Tuple[str, str, List[Dict[str, Any]]]] = {}
+        for b in blobs:
+            hit = self._extraction_cache.get(self._extraction_key(bucket_name, b))
+            if hit is not None:
+                cached[b.name] = hit
+        if cached:
+            print(f"💾 {len(cached)} objects unchanged since last run (cached)")
+        todo = [b for b in blobs if b.name not in cached]
+
+        # Audio and video are transcribed server‑side: start every operation
+        # at once and wait on them together rather than one recording at a time.
+        media_blobs = [b for b in todo if b.name.split(".")[-1].lower() in _REMOTE]
+        # Download + parse every PDF / DOCX / PPTX / TXT up front; downloads
+        # overlap with parsing instead of alternating with it.
+        local_blobs = [b for b in todo if b.name.split(".")[-1].lower() in _LOCAL]
+
+        # The media batch mostly waits on remote operations, so it runs on
+        # its own thread while the document pipeline downloads and parses.
+        with ThreadPoolExecutor(max_workers=1) as media_pool:
+            media_future = media_pool.submit(
+                self.extractor.transcribe_media_many,
+                [f"gs://{bucket_name}/{b.name}" for b in media_blobs],
+            )
+            # On the assistant's own loop, so this also works when the caller
+            # is already inside an event loop (Jupyter, async web frameworks)
+            local_results = self._run(self._ingest_local_blobs(bucket_name, local_blobs))
+            media_segments = dict(
+                zip((b.name for b in media_blobs), media_future.result())
+            )
+
+        # One batch load happens at one instant – stamp every document with it
+        processed_at = datetime.utcnow().isoformat() + "Z"
         for blob in blobs:
             try:
                 print(f"📄 Processing: {blob.name}")
@@ -91,49 +347,45 @@ class GenAIDocumentAssistant:
 
                 text_content = ""
                 content_type = "Unknown"
+                segments: List[Dict[str, Any]] = []
 
-                # ----------------- AUDIO -----------------
-                if file_ext in {"wav", "mp3", "flac", "m4a"}:
-                    gcs_uri = f"gs://{bucket_name}/{blob.name}"
-                    text_content = self.extractor.extract_from_audio(gcs_uri)
-                    content_type = "Audio Transcript"
+                # ----------------- CACHED ----------------
+                if blob.name in cached:
+                    text_content, content_type, segments = cached[blob.name]
 
-                # ----------------- VIDEO -----------------
-                elif file_ext in {"mp4", "avi", "mov", "mkv"}:
-                    gcs_uri = f"gs://{bucket_name}/{blob.name}"
-                    text_content = self.extractor.extract_from_video(gcs_uri)
-                    content_type = "Video Transcript"
+                # ----------------- AUDIO / VIDEO -----------------
+                elif file_ext in _REMOTE:
+                    # Already transcribed by the batch above
+                    segments = media_segments.pop(blob.name)
+                    text_content = segments_to_text(segments)
+                    content_type = _REMOTE[file_ext]
 
                 # ----------------- PDF / DOCX / PPTX / TXT -----------------
-                elif file_ext in {"pdf", "docx", "pptx", "txt"}:
-                    # All of these need a local temporary file first
-                    with tempfile.NamedTemporaryFile(suffix=f".{file_ext}") as tmp:
-                        blob.download_to_filename(tmp.name)
-
-                        if file_ext == "pdf":
-                            text_content = self.extractor.extract_from_pdf(tmp.name)
-                            content_type = "PDF Document"
-                        elif file_ext == "docx":
-                            text_content = self.extractor.extract_from_docx(tmp.name)
-                            content_type = "Word Document"
-                        elif file_ext == "pptx":
-                            text_content = self.extractor.extract_from_pptx(tmp.name)
-                            content_type = "PowerPoint Presentation"
-                        elif file_ext == "txt":
-                            text_content = self.extractor.extract_from_txt(tmp.name)
-                            content_type = "Plain Text"
+                elif file_ext in _LOCAL:
+                    # Already downloaded & parsed by the pipeline above
+                    result = local_results.pop(blob.name)
+                    if isinstance(result, Exception):
+                        raise result
+                    text_content, content_type = result
 
                 # --------------------------------------------------
                 # Store only if we got *something*
                 # --------------------------------------------------
                 if text_content.strip():
                     self.document_contents[file_name] = text_content
-                    self.document_metadata[file_name] = {
-                        "type": content_type,
-                        "size_chars": len(text_content),
-                        "gcs_path": f"gs://{bucket_name}/{blob.name}",
-                        "processed_at": datetime.utcnow().isoformat() + "Z",
-                    }
+                    self.document_metadata[file_name] = DocMeta(
+                        type=content_type,
+                        size_chars=len(text_content),
+                        gcs_path=f"gs://{bucket_name}/{blob.name}",
+                        processed_at=processed_at,
+                    )
+                    if segments:
+                        self.document_segments[file_name] = segments
+                    if blob.name not in cached:
+                        self._extraction_cache.set(
+                            self._extraction_key(bucket_name, blob),
+                            (text_content, content_type, segments),
+                        )
                     print(
                         f"✅ Loaded {file_name} "
                         f"({content_type}, {len(text_content)} chars)"
@@ -144,10 +396,232 @@ class GenAIDocumentAssistant:
             except Exception as exc:
                 print(f"❌ Error processing {blob.name}: {exc}")
 
+        self._build_index()
+        if self.use_context_cache:
+            with self._corpus_cache_lock:
+                self._refresh_corpus_cache()
+
         total = len(self.document_contents)
         print(f"\n📚 Total documents loaded: {total}")
         return total
 
+    @staticmethod
+    def _extraction_key(bucket_name: str, blob) -> str:
+        """
+        Cache key for one version of a blob's content.  Keyed by CRC32C, so
+        re‑uploading identical bytes (new generation, same content) is still
+        a hit; objects without a checksum fall back to their generation.
+        """
+        if blob.crc32c:
+            return f"{bucket_name}/{blob.name}#crc32c={blob.crc32c}"
+        return f"{bucket_name}/{blob.name}@{blob.generation}"
+
+    def _build_index(self) -> None:
+        """Tokenize every loaded document once into a BM25 inverted index."""
+        generation = self.document_contents.generation
+        self._doc_names = list(self.document_contents)
+        doc_len: List[int] = []
+        postings: Dict[str, Tuple[List[int], List[int]]] = {}
+        for doc_id, doc_name in enumerate(self._doc_names):
+            content_lc = self.document_contents.lower(doc_name)
+            tokens = [t for t in _TOKEN_RE.findall(content_lc) if _is_index_token(t)]
+            doc_len.append(len(tokens))
+            tf: Dict[str, int] = {}
+            for token in tokens:
+                tf[token] = tf.get(token, 0) + 1
+            for token, count in tf.items():
+                ids, counts = postings.setdefault(token, ([], []))
+                ids.append(doc_id)
+                counts.append(count)
+
+        self._term_ids = {token: t for t, token in enumerate(postings)}
+        df = np.array([len(p[0]) for p in postings.values()], dtype=np.int64)
+        self._term_offsets = np.zeros(len(df) + 1, dtype=np.int64)
+        np.cumsum(df, out=self._term_offsets[1:])
+        n_postings = int(self._term_offsets[-1])
+        self._post_doc = np.fromiter(
+            (d for ids, _ in postings.values() for d in ids),
+            dtype=np.int32, count=n_postings,
+        )
+
+        # The corpus is static between loads, so every posting's BM25 weight
+        # is computed here once, vectorised, rather than per query.
+        tf = np.fromiter(
+            (c for _, counts in postings.values() for c in counts),
+            dtype=np.float32, count=n_postings,
+        )
+        n_docs = len(self._doc_names)
+        lengths = np.array(doc_len, dtype=np.float32)
+        avgdl = float(lengths.mean()) if doc_len else 0.0
+        avgdl = avgdl or 1.0          # all‑empty corpus: no postings to weight anyway
+        idf = np.log1p((n_docs - df + 0.5) / (df + 0.5)).astype(np.float32)
+        norm = BM25_K1 * (1 - BM25_B + BM25_B * lengths[self._post_doc] / avgdl)
+        weights = np.repeat(idf, df) * (tf * (BM25_K1 + 1)) / (tf + norm)
+        self._bm25 = sparse.csc_matrix(
+            (weights.astype(np.float32), self._post_doc, self._term_offsets),
+            shape=(n_docs, len(df)),
+        )
+        self._index_generation = generation
+        self._drop_stale_answers()
+
+    def _index_current(self) -> bool:
+        """Whether the index still describes exactly what the store holds."""
+        return self._index_generation == self.document_contents.generation
+
+    def _drop_stale_answers(self) -> None:
+        """Clear memoized contexts and answers if the corpus changed since."""
+        generation = self.document_contents.generation
+        if generation != self._answers_generation:
+            self._context_cache.cache_clear()
+            self._semantic_cache.clear()
+            self._answers_generation = generation
+
+    def _refresh_corpus_cache(self) -> None:
+        """Replace the server‑side corpus cache with one for the current load."""
+        if self._cached_content is not None:
+            try:
+                self._cached_content.delete()
+            except Exception as exc:
+                print(f"⚠️  Could not delete previous context cache: {exc}")
+        self._cached_content = None
+        self._cached_model = None
+        if not self.document_contents:
+            return
+
+        corpus = "".join(
+            [
+                "DOCUMENT CONTENTS:\n\n",
+                *(
+                    f"=== {name} ({self.document_metadata[name].type}) ===\n{content}\n\n"
+                    for name, content in self.document_contents.items()
+                ),
+            ]
+        )
+        try:
+            self._cached_content = CachedContent.create(
+                model_name=self.model_name,
+                system_instruction=ANSWER_INSTRUCTIONS,
+                contents=[corpus],
+                ttl=CONTEXT_CACHE_TTL,
+            )
+            self._cached_model = GenerativeModel.from_cached_content(
+                cached_content=self._cached_content,
+                generation_config=self._generation_config,
+            )
+        except Exception as exc:
+            # Too small / too large for caching, or caching unavailable in
+            # this region – questions fall back to per‑query context.
+            print(f"⚠️  Context cache not created, using per‑query context: {exc}")
+            self._cached_content = None
+            self._cached_model = None
+            return
+        self._cached_content_expires = datetime.now(timezone.utc) + CONTEXT_CACHE_TTL
+        self._cached_corpus_chars = len(corpus)
+        print(f"🗄️  Cached {len(corpus)} chars of context as {self._cached_content.name}")
+
+    def _corpus_cache(self) -> Optional[_CorpusCache]:
+        """
+        ``(cached‑corpus model, cache name)``, or ``None`` when questions must
+        carry their own context.  The cache's TTL is extended once it is close
+        to expiry; a cache that has already expired, or whose TTL can't be
+        extended, is recreated from the loaded documents.  The pair is read
+        under the lock and handed to the generate helpers, so a concurrent
+        refresh can't swap or clear it halfway through a question.
+        """
+        with self._corpus_cache_lock:
+            if self._cached_model is None:
+                return None
+            now = datetime.now(timezone.utc)
+            if now >= self._cached_content_expires:
+                self._refresh_corpus_cache()
+            elif now > self._cached_content_expires - CONTEXT_CACHE_REFRESH:
+                try:
+                    self._cached_content.update(ttl=CONTEXT_CACHE_TTL)
+                    self._cached_content_expires = now + CONTEXT_CACHE_TTL
+                except Exception as exc:
+                    print(f"⚠️  Could not extend context cache, recreating it: {exc}")
+                    self._refresh_corpus_cache()
+            if self._cached_model is None:
+                return None
+            return self._cached_model, self._cached_content.name
+
+    async def _ingest_local_blobs(
+        self, bucket_name: str, blobs: List[Any]
+    ) -> Dict[str, Any]:
+        """
+        Producer/consumer pipeline: ``DOWNLOAD_CONCURRENCY`` producers pull
+        blobs into memory and push them onto a bounded queue, while
+        ``PARSE_WORKERS`` consumers pop buffers and hand PDF / DOCX / PPTX to
+        a process pool running the extractors (plain text is decoded by its
+        producer and never queued).  The slower of network and CPU hides the
+        other, and parsing uses every core instead of one.
+
+        Returns ``{blob.name: (text, content_type)}``, or the exception raised
+        for that blob, so the caller can report failures per file.
+        """
+        loop    = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue(maxsize=PIPELINE_QUEUE_SIZE)
+        results: Dict[str, Any] = {}
+        pending = iter(blobs)            # shared by all producers
+
+        with ThreadPoolExecutor(max_workers=DOWNLOAD_CONCURRENCY) as io_pool, \
+             ProcessPoolExecutor(
+                 max_workers=PARSE_WORKERS,
+                 mp_context=MP_CONTEXT,   # never fork() – see data_extractor
+                 initializer=_init_parse_worker,
+                 initargs=(self.project_id, self.processor_id),
+             ) as parse_pool, \
+             tempfile.TemporaryDirectory(prefix="downloads-") as spool_dir:
+
+            async def produce() -> None:
+                for blob in pending:
+                    gcs_uri = f"gs://{bucket_name}/{blob.name}"
+                    try:
+                        if blob.name.split(".")[-1].lower() == "txt":
+                            # Decoding is one C call – done on the download
+                            # thread, so the bytes never queue for a parser.
+                            results[blob.name] = await loop.run_in_executor(
+                                io_pool, _download_text, self.extractor, gcs_uri
+                            )
+                            continue
+                        if (blob.size or 0) > DOWNLOAD_SPOOL_BYTES:
+                            fd, path = tempfile.mkstemp(dir=spool_dir)
+                            os.close(fd)
+                            source = await loop.run_in_executor(
+                                io_pool, self.extractor._download_to_path, gcs_uri, path
+                            )
+                        else:
+                            buf = await loop.run_in_executor(
+                                io_pool, self.extractor._download_to_bytes, gcs_uri
+                            )
+                            source = buf.getvalue()
+                    except Exception as exc:
+                        results[blob.name] = exc
+                        continue
+                    await queue.put((blob, source))   # blocks while parsers lag
+
+            async def consume() -> None:
+                while (item := await queue.get()) is not None:
+                    blob, source = item
+                    file_ext = blob.name.split(".")[-1].lower()
+                    try:
+                        results[blob.name] = await loop.run_in_executor(
+                            parse_pool, _parse_in_worker, file_ext, source
+                        )
+                    except Exception as exc:
+                        results[blob.name] = exc
+                    finally:
+                        if isinstance(source, str):
+                            os.remove(source)
+
+            consumers = [asyncio.create_task(consume()) for _ in range(PARSE_WORKERS)]
+            await asyncio.gather(*(produce() for _ in range(DOWNLOAD_CONCURRENCY)))
+            for _ in consumers:
+                await queue.put(None)    # one stop sentinel per consumer
+            await asyncio.gather(*consumers)
+
+        return results
+
     # ------------------------------------------------------------------
     # 2️⃣ Build a relevance‑based context for a query
     # ------------------------------------------------------------------
@@ -155,64 +629,152 @@ class GenAIDocumentAssistant:
         self, query: str, max_context_len: int = 8000
     ) -> str:
         """
-        Very simple keyword‑match relevance scorer.
+        BM25 relevance scorer over the inverted index built at load time –
+        each query only walks the postings of its own terms, so no document
+        text is scanned per query.
         Returns a string that will be appended to the LLM prompt.
+        Results are memoized until the documents change.
         """
+        self._drop_stale_answers()
+        return self._context_cache(query, max_context_len)
+
+    def _build_context(self, query: str, max_context_len: int) -> str:
         if not self.document_contents:
             return "No documents loaded."
 
-        query_terms = set(query.lower().split())
-        ranked: List[Dict[str, Any]] = []
-
-        # Score each document
-        for doc_name, content in self.document_contents.items():
-            content_lower = content.lower()
-            score = sum(1 for term in query_terms if term in content_lower)
-            if score > 0:
-                ranked.append(
-                    {
-                        "name": doc_name,
-                        "content": content,
-                        "score": score,
-                        "type": self.document_metadata[doc_name]["type"],
-                    }
-                )
+        query_terms = frozenset(
+            t for t in _TOKEN_RE.findall(query.lower()) if _is_index_token(t)
+        )
+        if self._index_current():
+            names = self._doc_names
+            term_ids = np.array(
+                [self._term_ids[t] for t in query_terms if t in self._term_ids],
+                dtype=np.int64,
+            )
+            # Sum of the query terms' weight columns: a sparse mat‑vec over
+            # just those columns, i.e. O(postings of the query terms)
+            if len(term_ids):
+                scores = self._bm25[:, term_ids] @ np.ones(len(term_ids), dtype=np.float32)
+            else:
+                scores = np.zeros(len(names), dtype=np.float32)
+        else:
+            # Documents written since the last load → the index doesn't cover
+            # them yet.  Count occurrences instead: str.count scans in C, no
+            # per‑char Python, and each document is lowercased only once.
+            names = list(self.document_contents)
+            scores = np.zeros(len(names), dtype=np.float32)
+            if query_terms:
+                for i, n in enumerate(names):
+                    content_lc = self.document_contents.lower(n)
+                    scores[i] = sum(content_lc.count(t) for t in query_terms)
+
+        # Top‑k by score without sorting the whole corpus; name breaks ties
+        # → deterministic order
+        top = _topk(scores, CONTEXT_TOP_K)
+        # (score, name) only – text is read lazily, and only as much as fits
+        ranked: List[Tuple[float, str]] = [
+            (float(scores[i]), names[i])
+            for i in sorted(top, key=lambda i: (-scores[i], names[i]))
+        ]
 
         # Fallback if nothing matches
         if not ranked:
-            sample = list(self.document_contents.items())[:2]
-            ranked = [
-                {
-                    "name": n,
-                    "content": c,
-                    "score": 0,
-                    "type": self.document_metadata[n]["type"],
-                }
-                for n, c in sample
-            ]
+            ranked = [(0.0, n) for n in names[:2]]
 
-        ranked.sort(key=lambda d: d["score"], reverse=True)
+        # Collect pieces and join once – ``context +=`` would recopy the
+        # growing string on every document.
+        parts: List[str] = ["DOCUMENT CONTENTS:\n\n"]
+        current_len = len(parts[0])
 
-        context = "DOCUMENT CONTENTS:\n\n"
-        current_len = len(context)
-
-        for doc in ranked:
-            header = f"=== {doc['name']} ({doc['type']}) ===\n"
+        for _, name in ranked:
+            header = f"=== {name} ({self.document_metadata[name].type}) ===\n"
             remaining = max_context_len - current_len - len(header) - 100
             if remaining <= 0:
                 break
-            snippet = doc["content"][:remaining]
-            context += header + snippet + "\n\n"
-            current_len = len(context)
+            snippet = self.document_contents.read(name, remaining)
+            parts += (header, snippet, "\n\n")
+            current_len += len(header) + len(snippet) + 2
 
-        return context
+        return "".join(parts)
 
     # ------------------------------------------------------------------
     # 3️⃣ Ask a question (public method)
     # ------------------------------------------------------------------
-    def ask_question(self, question: str) -> Dict[str, Any]:
+    def ask_question(self, question: str, stream: bool = False) -> Dict[str, Any]:
         """
         Returns a dict with answer, sources, confidence, etc.
+
+        With ``stream=True`` the ``"answer"`` value is an iterator of text
+        chunks, so a UI can start rendering before generation has finished.
+        """
+        prepared = self._prepare_question(question)
+        if isinstance(prepared, dict):
+            if stream:
+                prepared["answer"] = iter([prepared["answer"]])
+            return prepared
+        prompt, context_length, question_emb, corpus_cache = prepared
+
+        # 3️⃣ Call Gemini
+        if stream:
+            chunks = self._generate_stream(
+                prompt, corpus_cache, self._remember_for(question_emb)
+            )
+            return self._answer(chunks, context_length, None)
+        try:
+            answer_text = self._generate(prompt, corpus_cache).strip()
+        except Exception as exc:
+            return self._error_answer(exc)
+        return self._answer(answer_text, context_length, question_emb)
+
+    def ask_questions(self, questions: List[str]) -> List[Dict[str, Any]]:
+        """
+        Answer several questions concurrently (same result shape as
+        ``ask_question``, in input order): every Gemini call is in flight at
+        once on one event loop instead of paying one round trip after another.
+        """
+        async def ask_all() -> List[Dict[str, Any]]:
+            return await self._gather_limited(
+                self.ask_question_async(q) for q in questions
+            )
+
+        return self._run(ask_all())
+
+    async def ask_question_async(self, question: str, stream: bool = False) -> Dict[str, Any]:
+        """
+        ``ask_question`` for callers that run an event loop (async web
+        frameworks, many users per process): the Gemini call is awaited on
+        the shared async client, so concurrent questions overlap instead of
+        each blocking a thread.
+
+        With ``stream=True`` the ``"answer"`` value is an async iterator of
+        text chunks.
+        """
+        # Embedding + scoring are blocking calls – keep them off the loop
+        prepared = await asyncio.to_thread(self._prepare_question, question)
+        if isinstance(prepared, dict):
+            if stream:
+                prepared["answer"] = self._as_async(prepared["answer"])
+            return prepared
+        prompt, context_length, question_emb, corpus_cache = prepared
+
+        if stream:
+            chunks = self._generate_stream_async(
+                prompt, corpus_cache, self._remember_for(question_emb)
+            )
+            return self._answer(chunks, context_length, None)
+        try:
+            answer_text = (await self._generate_async(prompt, corpus_cache)).strip()
+        except Exception as exc:
+            return self._error_answer(exc)
+        return self._answer(answer_text, context_length, question_emb)
+
+    def _prepare_question(self, question: str):
+        """
+        Everything ``ask_question`` does before calling Gemini.  Returns a
+        finished result dict (nothing loaded, semantic cache hit) or
+        ``(prompt, context_length, question_embedding, corpus_cache)`` –
+        with a ``corpus_cache`` the prompt omits the corpus, which lives in
+        the server‑side context cache instead.
         """
         if not self.document_contents:
             return {
@@ -221,13 +783,32 @@ class GenAIDocumentAssistant:
                 "confidence": "low",
             }
 
+        # 0️⃣ A recent, near‑identical question? Reuse its answer.
+        self._drop_stale_answers()
+        question_emb = self._embed_question(question) if self._cache_responses else None
+        if question_emb is not None:
+            cached = self._semantic_cache.get(question_emb)
+            if cached is not None:
+                sources = list(self.document_contents.keys())
+                return {
+                    "answer": cached,
+                    "sources": sources,
+                    "confidence": "cached",
+                    "documents_used": len(sources),
+                }
+
+        corpus_cache = self._corpus_cache()
+        if corpus_cache is not None:
+            prompt = f"""QUESTION: {question}
+
+ANSWER:"""
+            return prompt, self._cached_corpus_chars, question_emb, corpus_cache
+
         # 1️⃣ Build the context
         context = self.create_context_from_documents(question)
 
         # 2️⃣ Prompt
-        prompt = f"""You are an AI assistant that answers questions strictly using the
-documents provided in the CONTEXT section below. Do NOT hallucinate.
-If the answer can't be found, explicitly say so and cite the relevant documents.
+        prompt = f"""{ANSWER_INSTRUCTIONS}
 
 QUESTION: {question}
 
@@ -235,89 +816,313 @@ CONTEXT:
 {context}
 
 ANSWER:"""
+        return prompt, len(context), question_emb, None
 
-        # 3️⃣ Call Gemini
+    def _answer(self, answer_text, context_length: int, question_emb) -> Dict[str, Any]:
+        """Result dict for an answer – its text, or a stream of chunks (not cached here)."""
+        if question_emb is not None:
+            self._semantic_cache.put(question_emb, answer_text)
+        sources = list(self.document_contents.keys())
+        return {
+            "answer": answer_text,
+            "sources": sources,
+            "confidence": "high",
+            "context_length": context_length,
+            "documents_used": len(sources),
+        }
+
+    @staticmethod
+    def _error_answer(exc: Exception) -> Dict[str, Any]:
+        return {
+            "answer": f"Error generating response: {exc}",
+            "sources": [],
+            "confidence": "error",
+        }
+
+    def _run(self, coro):
+        """Run ``coro`` on the assistant's event loop and wait for its result."""
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result()
+
+    async def _on_loop(self, coro):
+        """Await ``coro`` on the assistant's event loop, whichever loop awaits it."""
+        if asyncio.get_running_loop() is self._loop:
+            return await coro
+        return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(coro, self._loop))
+
+    async def _iter_on_loop(self, stream_coro) -> AsyncIterator[Any]:
+        """Iterate the async stream ``stream_coro`` returns, stepping it on the assistant's loop."""
+        stream = await self._on_loop(stream_coro)
+
+        async def step():
+            try:
+                return await stream.__anext__()
+            except StopAsyncIteration:
+                return _STREAM_END
+
+        while (chunk := await self._on_loop(step())) is not _STREAM_END:
+            yield chunk
+
+    @staticmethod
+    async def _gather_limited(coros) -> List[Any]:
+        """``asyncio.gather`` with at most ``QUESTION_WORKERS`` calls in flight."""
+        limit = asyncio.Semaphore(QUESTION_WORKERS)
+
+        async def run(coro):
+            async with limit:
+                return await coro
+
+        return await asyncio.gather(*(run(c) for c in coros))
+
+    @cached_property
+    def _embedding_model(self) -> TextEmbeddingModel:
+        return TextEmbeddingModel.from_pretrained(EMBEDDING_MODEL)
+
+    def _embed_question(self, question: str) -> Optional[List[float]]:
+        """Question embedding for the semantic cache, or ``None`` if it failed."""
         try:
-            response = self.model.generate_content(prompt)
-            answer_text = response.text.strip()
-            sources = list(self.document_contents.keys())
-            return {
-                "answer": answer_text,
-                "sources": sources,
-                "confidence": "high",
-                "context_length": len(context),
-                "documents_used": len(sources),
-            }
+            return self._embedding_model.get_embeddings([question])[0].values
         except Exception as exc:
-            return {
-                "answer": f"Error generating response: {exc}",
-                "sources": [],
-                "confidence": "error",
-            }
+            print(f"⚠️  Question embedding failed, skipping semantic cache: {exc}")
+            return None
+
+    def _remember_for(self, question_emb) -> Optional[Callable[[str], None]]:
+        """Callback that files a completed streamed answer in the semantic cache."""
+        if question_emb is None:
+            return None
+        return lambda answer_text: self._semantic_cache.put(question_emb, answer_text.strip())
+
+    @staticmethod
+    async def _as_async(answer_text: str) -> AsyncIterator[str]:
+        """A finished answer as a one‑chunk async stream."""
+        yield answer_text
+
+    def _model_for(self, corpus_cache: Optional[_CorpusCache]) -> GenerativeModel:
+        return corpus_cache[0] if corpus_cache else self.model
+
+    def _prompt_hash(self, prompt: str, corpus_cache: Optional[_CorpusCache] = None) -> str:
+        # A cached‑context prompt only means something together with its cache
+        prefix = corpus_cache[1] if corpus_cache else self.model_name
+        return hashlib.blake2b(
+            f"{prefix}\n{prompt}".encode(), digest_size=16
+        ).hexdigest()
+
+    def _generate(self, prompt: str, corpus_cache: Optional[_CorpusCache] = None) -> str:
+        """``model.generate_content(prompt).text``, served from cache when possible."""
+        if not self._cache_responses:
+            return self._model_for(corpus_cache).generate_content(prompt).text
+        return self._cached_generate(
+            self._prompt_hash(prompt, corpus_cache), prompt, corpus_cache
+        )
+
+    async def _generate_async(
+        self, prompt: str, corpus_cache: Optional[_CorpusCache] = None
+    ) -> str:
+        """Async ``_generate``: same disk cache, ``generate_content_async`` on a miss."""
+        model = self._model_for(corpus_cache)
+        if not self._cache_responses:
+            return (await self._on_loop(model.generate_content_async(prompt))).text
+        prompt_hash = self._prompt_hash(prompt, corpus_cache)
+        text = self._response_cache.get(prompt_hash)
+        if text is None:
+            text = (await self._on_loop(model.generate_content_async(prompt))).text
+            self._response_cache.set(prompt_hash, text)
+        return text
+
+    def _generate_stream(
+        self,
+        prompt: str,
+        corpus_cache: Optional[_CorpusCache] = None,
+        on_complete: Optional[Callable[[str], None]] = None,
+    ) -> Iterator[str]:
+        """
+        Streaming counterpart of ``_generate``: yields text chunks as Gemini
+        produces them (a cached answer comes back as a single chunk) and
+        stores the full answer once the stream completes.
+
+        ``on_complete`` receives the full answer only when the stream
+        finished cleanly; a failed call yields an error chunk and nothing is
+        cached anywhere.
+        """
+        prompt_hash = self._prompt_hash(prompt, corpus_cache)
+        cached = self._stream_cached(prompt_hash, on_complete)
+        if cached is not None:
+            yield cached
+            return
+        parts = []
+        try:
+            model = self._model_for(corpus_cache)
+            for chunk in model.generate_content(prompt, stream=True):
+                parts.append(chunk.text)
+                yield chunk.text
+        except Exception as exc:
+            yield f"Error generating response: {exc}"
+            return
+        self._stream_completed(prompt_hash, "".join(parts), on_complete)
+
+    async def _generate_stream_async(
+        self,
+        prompt: str,
+        corpus_cache: Optional[_CorpusCache] = None,
+        on_complete: Optional[Callable[[str], None]] = None,
+    ) -> AsyncIterator[str]:
+        """Async counterpart of ``_generate_stream`` (same caching and errors)."""
+        prompt_hash = self._prompt_hash(prompt, corpus_cache)
+        cached = self._stream_cached(prompt_hash, on_complete)
+        if cached is not None:
+            yield cached
+            return
+        parts = []
+        try:
+            model = self._model_for(corpus_cache)
+            async for chunk in self._iter_on_loop(
+                model.generate_content_async(prompt, stream=True)
+            ):
+                parts.append(chunk.text)
+                yield chunk.text
+        except Exception as exc:
+            yield f"Error generating response: {exc}"
+            return
+        self._stream_completed(prompt_hash, "".join(parts), on_complete)
+
+    def _stream_cached(
+        self, prompt_hash: str, on_complete: Optional[Callable[[str], None]]
+    ) -> Optional[str]:
+        """A stored answer to replay as a single chunk, or ``None`` on a miss."""
+        cached = self._response_cache.get(prompt_hash) if self._cache_responses else None
+        if cached is None:
+            return None
+        if on_complete is not None:
+            on_complete(cached)
+        return cached.strip()
+
+    def _stream_completed(
+        self, prompt_hash: str, answer_text: str, on_complete: Optional[Callable[[str], None]]
+    ) -> None:
+        """Persist a stream that ran to the end (never called after an error)."""
+        if self._cache_responses:
+            self._response_cache.set(prompt_hash, answer_text)
+        if on_complete is not None:
+            on_complete(answer_text)
+
+    def _generate_uncached(
+        self, prompt_hash: str, prompt: str, corpus_cache: Optional[_CorpusCache]
+    ) -> str:
+        """In‑memory LRU miss: try the disk cache, then Gemini."""
+        text = self._response_cache.get(prompt_hash)
+        if text is None:
+            text = self._model_for(corpus_cache).generate_content(prompt).text
+            self._response_cache.set(prompt_hash, text)
+        return text
 
     # ------------------------------------------------------------------
     # Optional helper utilities (summary, list, search)
     # ------------------------------------------------------------------
     def get_document_summary(self) -> Dict[str, Any]:
-        """Generates a concise, bullet‑point summary of all loaded docs."""
+        """
+        Generates a concise, bullet‑point summary of all loaded docs: one
+        small prompt per document, all sent concurrently, instead of one
+        huge prompt that truncates whatever does not fit.
+        """
         if not self.document_contents:
             return {"summary": "No documents loaded"}
 
-        summary_context = self.create_context_from_documents(
-            "summary overview", max_context_len=12000
-        )
-        prompt = f"""Please provide a concise, bullet‑point summary of the following
-documents. Include for each document:
-• Title / file name
-• Main topics covered
-• Any especially important fact or figure
-
-CONTENTS:
-{summary_context}
+        async def summarise_all() -> List[str]:
+            return await self._gather_limited(
+                self._generate_async(
+                    self._summary_prompt(
+                        name,
+                        self.document_metadata[name].type,
+                        self.document_contents.read(name, SUMMARY_DOC_CHARS),
+                    )
+                )
+                for name in self.document_contents
+            )
 
-SUMMARY:"""
         try:
-            resp = self.model.generate_content(prompt)
+            summaries = self._run(summarise_all())
             return {
-                "summary": resp.text.strip(),
+                "summary": "\n\n".join(s.strip() for s in summaries),
                 "document_count": len(self.document_contents),
-                "total_chars": sum(len(c) for c in self.document_contents.values()),
+                "total_chars": sum(m.size_chars for m in self.document_metadata.values()),
                 "document_types": list(
-                    set(m["type"] for m in self.document_metadata.values())
+                    set(m.type for m in self.document_metadata.values())
                 ),
             }
         except Exception as exc:
             return {"summary": f"Error generating summary: {exc}"}
 
+    @staticmethod
+    def _summary_prompt(doc_name: str, doc_type: str, content: str) -> str:
+        return f"""Please provide a concise, bullet‑point summary of the following
+document. Include:
+• Title / file name
+• Main topics covered
+• Any especially important fact or figure
+
+=== {doc_name} ({doc_type}) ===
+{content}
+
+SUMMARY:"""
+
     def list_documents(self) -> List[Dict[str, Any]]:
         """Return a lightweight list of all loaded docs + metadata."""
         return [
             {
                 "name": name,
-                "type": meta["type"],
-                "size_chars": meta["size_chars"],
-                "processed_at": meta["processed_at"],
-                "gcs_path": meta["gcs_path"],
+                "type": meta.type,
+                "size_chars": meta.size_chars,
+                "processed_at": meta.processed_at,
+                "gcs_path": meta.gcs_path,
             }
             for name, meta in self.document_metadata.items()
         ]
 
     def search_documents(self, term: str) -> List[Dict[str, Any]]:
-        """Simple substring search that returns a snippet around each hit."""
+        """
+        Substring search that returns a snippet around the first hit in each
+        document.  The token postings only narrow the candidates: words that
+        lie entirely inside a multi‑word term must occur as whole tokens, so
+        documents lacking any of them are skipped without being scanned.  A
+        single word can be part of a longer one ("price" in "prices"), so it
+        is always searched in every document.
+        """
         term_lc = term.lower()
+        if not self._index_current():
+            # Documents written since the last load – no postings to trust
+            return self._substring_hits(term_lc, list(self.document_contents))
+        tokens = _TOKEN_RE.findall(term_lc)
+
+        # The first and last words may be cut off mid‑word by the term;
+        # the indexed ones in between must occur as whole tokens.
+        candidates = None
+        for token in tokens[1:-1]:
+            if not _is_index_token(token):
+                continue
+            t = self._term_ids.get(token)
+            if t is None:
+                return []
+            docs = self._post_doc[self._term_offsets[t]:self._term_offsets[t + 1]]
+            candidates = docs if candidates is None else np.intersect1d(candidates, docs)
+        names = (
+            self._doc_names if candidates is None
+            else [self._doc_names[d] for d in np.sort(candidates)]
+        )
+        return self._substring_hits(term_lc, names)
+
+    def _substring_hits(self, term_lc: str, names: List[str]) -> List[Dict[str, Any]]:
         hits: List[Dict[str, Any]] = []
-        for name, content in self.document_contents.items():
-            content_lc = content.lower()
-            idx = content_lc.find(term_lc)
+        for name in names:
+            idx = self.document_contents.find_lower(name, term_lc)
             if idx != -1:
-                start = max(0, idx - 120)
-                end = min(len(content), idx + len(term) + 120)
-                hits.append(
-                    {
-                        "document": name,
-                        "type": self.document_metadata[name]["type"],
-                        "snippet": content[start:end],
-                        "position": idx,
-                    }
-                )
+                hits.append(self._search_hit(name, idx, len(term_lc)))
         return hits
+
+    def _search_hit(self, name: str, idx: int, term_len: int) -> Dict[str, Any]:
+        return {
+            "document": name,
+            "type": self.document_metadata[name].type,
+            "snippet": self.document_contents.read_range(
+                name, idx - 120, idx + term_len + 120
+            ),
+            "position": idx,
+        }
@@ -0,0 +1,93 @@
+# --------------------------------------------------------------
+# semantic_cache.py
+# --------------------------------------------------------------
+"""
+Answer cache keyed by question *meaning* rather than exact prompt text.
+
+Each entry is an L2‑normalised question embedding plus the answer that was
+given for it.  A lookup is a single matrix‑vector product (cosine similarity
+against every live entry); the best match is returned when it clears the
+similarity threshold and has not outlived its TTL.  When full, the
+least‑recently‑used entry (or an expired one) is overwritten.
+"""
+
+import threading
+import time
+from typing import List, Optional
+
+import numpy as np
+
+
+# ----------------------------------------------------------------------
+# Defaults.  The threshold is deliberately strict: a false hit returns the
+# answer to a *different* question, which is worse than a Gemini round trip.
+# ----------------------------------------------------------------------
+SEMANTIC_CACHE_THRESHOLD = 0.92   # minimum cosine similarity for a hit
+SEMANTIC_CACHE_TTL       = 300    # seconds an entry stays valid
+SEMANTIC_CACHE_CAPACITY  = 256    # entries kept before LRU eviction
+
+
+class SemanticCache:
+    def __init__(
+        self,
+        threshold: float = SEMANTIC_CACHE_THRESHOLD,
+        ttl: float = SEMANTIC_CACHE_TTL,
+        capacity: int = SEMANTIC_CACHE_CAPACITY,
+    ):
+        self.threshold = threshold
+        self.ttl       = ttl
+        self.capacity  = capacity
+
+        self._lock = threading.Lock()       # ask_questions() calls from threads
+        self._emb: Optional[np.ndarray] = None   # (capacity, dim), allocated on first add
+        self._answers: List[Optional[str]] = [None] * capacity
+        self._expires   = np.zeros(capacity, dtype=np.float64)
+        self._last_used = np.zeros(capacity, dtype=np.float64)
+        self._size = 0
+
+    @staticmethod
+    def _normalise(embedding) -> np.ndarray:
+        vec = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vec)
+        return vec / norm if norm else vec
+
+    def get(self, embedding) -> Optional[str]:
+        """Cached answer for the closest live question, or ``None``."""
+        query = self._normalise(embedding)
+        with self._lock:
+            if not self._size:
+                return None
+            now  = time.monotonic()
+            sims = self._emb[: self._size] @ query
+            sims[self._expires[: self._size] <= now] = -np.inf
+            best = int(np.argmax(sims))
+            if sims[best] < self.threshold:
+                return None
+            self._last_used[best] = now
+            return self._answers[best]
+
+    def put(self, embedding, answer: str) -> None:
+        """Remember ``answer`` for a question, evicting the LRU entry if full."""
+        vec = self._normalise(embedding)
+        with self._lock:
+            now = time.monotonic()
+            if self._emb is None or self._emb.shape[1] != vec.shape[0]:
+                self._emb  = np.zeros((self.capacity, vec.shape[0]), dtype=np.float32)
+                self._size = 0
+            if self._size < self.capacity:
+                slot = self._size
+                self._size += 1
+            else:
+                # Expired entries count as least recently used
+                recency = np.where(self._expires > now, self._last_used, -np.inf)
+                slot = int(np.argmin(recency))
+            self._emb[slot]       = vec
+            self._answers[slot]   = answer
+            self._expires[slot]   = now + self.ttl
+            self._last_used[slot] = now
+
+    def clear(self) -> None:
+        """Drop every entry (answers depend on the loaded corpus)."""
+        with self._lock:
+            self._size = 0
+            self._answers = [None] * self.capacity
@@ -0,0 +1,103 @@
+# --------------------------------------------------------------
+# test_data_extractor.py
+# --------------------------------------------------------------
+import io
+import zipfile
+
+import fitz
+import pytest
+
+from data_extractor import PDF_PARALLEL_MIN_PAGES, DataExtractor
+
+W = 'xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"'
+A = 'xmlns:a="http://schemas.openxmlformats.org/drawingml/2006/main"'
+P = 'xmlns:p="http://schemas.openxmlformats.org/presentationml/2006/main"'
+R = 'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships"'
+MC = 'xmlns:mc="http://schemas.openxmlformats.org/markup-compatibility/2006"'
+REL = "http://schemas.openxmlformats.org/package/2006/relationships"
+
+
+@pytest.fixture
+def extractor():
+    return DataExtractor("project", "processor", pdf_workers=1)
+
+
+def _zip(parts):
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, "w") as zf:
+        for name, xml in parts.items():
+            zf.writestr(name, xml)
+    buf.seek(0)
+    return buf
+
+
+def _docx(body):
+    return _zip({"word/document.xml": f"<w:document {W} {MC}><w:body>{body}</w:body></w:document>"})
+
+
+def _slide(text):
+    return f"<p:sld {P} {A}><p:cSld><p:spTree><p:sp><p:txBody><a:p><a:r><a:t>{text}</a:t></a:r></a:p></p:txBody></p:sp></p:spTree></p:cSld></p:sld>"
+
+
+def test_docx_tabs_and_breaks(extractor):
+    body = (
+        "<w:p><w:pPr><w:tabs><w:tab w:val='left' w:pos='720'/></w:tabs></w:pPr>"
+        "<w:r><w:t>Name</w:t><w:tab/><w:t>Value</w:t><w:br/><w:t>next</w:t><w:cr/><w:t>end</w:t></w:r></w:p>"
+    )
+    assert extractor.extract_from_docx(_docx(body)) == "Name\tValue\nnext\nend"
+
+
+def test_docx_text_box_is_read_once(extractor):
+    box = "<w:txbxContent><w:p><w:r><w:t>Box text</w:t></w:r></w:p></w:txbxContent>"
+    body = (
+        "<w:p><w:r><w:t xml:space='preserve'>Before </w:t></w:r>"
+        "<w:r><mc:AlternateContent>"
+        f"<mc:Choice Requires='wps'><w:drawing><wps:txbx xmlns:wps='urn:wps'>{box}</wps:txbx></w:drawing></mc:Choice>"
+        f"<mc:Fallback><w:pict><v:textbox xmlns:v='urn:v'>{box}</v:textbox></w:pict></mc:Fallback>"
+        "</mc:AlternateContent></w:r>"
+        "<w:r><w:t>after</w:t></w:r></w:p>"
+    )
+    assert extractor.extract_from_docx(_docx(body)) == "Before after\nBox text"
+
+
+def test_pptx_follows_presentation_order(extractor):
+    # Slide parts that were never renumbered after reordering the deck
+    deck = _zip({
+        "ppt/presentation.xml": (
+            f"<p:presentation {P} {R}><p:sldIdLst>"
+            "<p:sldId id='256' r:id='rId3'/><p:sldId id='257' r:id='rId2'/>"
+            "</p:sldIdLst></p:presentation>"
+        ),
+        "ppt/_rels/presentation.xml.rels": (
+            f"<Relationships xmlns='{REL}'>"
+            "<Relationship Id='rId2' Target='slides/slide1.xml'/>"
+            "<Relationship Id='rId3' Target='/ppt/slides/slide2.xml'/>"
+            "</Relationships>"
+        ),
+        "ppt/slides/slide1.xml": _slide("second"),
+        "ppt/slides/slide2.xml": _slide("first"),
+    })
+    assert extractor.extract_from_pptx(deck) == "first\nsecond"
+
+
+def test_pptx_without_presentation_part_uses_slide_numbers(extractor):
+    deck = _zip({
+        "ppt/slides/slide10.xml": _slide("ten"),
+        "ppt/slides/slide2.xml": _slide("two"),
+    })
+    assert extractor.extract_from_pptx(deck) == "two\nten"
+
+
+def test_page_parallel_pdf_matches_serial(extractor):
+    doc = fitz.open()
+    for i in range(PDF_PARALLEL_MIN_PAGES + 4):
+        doc.new_page().insert_text((72, 72), f"page {i}")
+    pdf = doc.tobytes()
+    serial = extractor.extract_from_pdf(io.BytesIO(pdf))
+    parallel = DataExtractor("project", "processor", pdf_workers=4).extract_from_pdf(io.BytesIO(pdf))
+    assert parallel == serial
+    assert serial.splitlines()[-1] == f"page {PDF_PARALLEL_MIN_PAGES + 3}"
+
+
+def test_txt_replaces_undecodable_bytes(extractor):
+    assert extractor.extract_from_txt(io.BytesIO(b"ok \xff end\n")) == "ok � end"
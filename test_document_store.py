@@ -0,0 +1,72 @@
+# --------------------------------------------------------------
+# test_document_store.py
+# --------------------------------------------------------------
+import pytest
+
+from document_store import DocumentStore, MemoryDocumentStore
+
+
+@pytest.fixture(params=["disk", "memory"])
+def store(request, tmp_path):
+    return DocumentStore(str(tmp_path)) if request.param == "disk" else MemoryDocumentStore()
+
+
+def test_mapping_keeps_insertion_order_across_replacement(store):
+    store["a"] = "first"
+    store["b"] = "second"
+    store["a"] = "replaced"
+    assert list(store) == ["a", "b"]
+    assert store["a"] == "replaced"
+    assert len(store) == 2 and "b" in store and "c" not in store
+
+    del store["a"]
+    assert list(store) == ["b"]
+    with pytest.raises(KeyError):
+        store["a"]
+
+    store.clear()
+    assert not store
+
+
+def test_read_and_read_range_match_slicing(store):
+    for name, text in {"ascii": "Revenue grew 40% in Q3", "utf8": "Café – naïve résumé €5"}.items():
+        store[name] = text
+        assert store.chars(name) == len(text)
+        assert store.read(name, 6) == text[:6]
+        assert store.read(name, 1000) == text
+        assert store.read(name, 0) == ""
+        for start, end in [(0, 4), (3, 9), (-5, 2), (len(text) - 3, len(text) + 50), (9, 3)]:
+            assert store.read_range(name, start, end) == text[max(start, 0):end]
+
+
+def test_lowercase_lookups(store):
+    store["doc"] = "Ünïcode Revenue and REVENUE"
+    assert store.lower("doc") == "ünïcode revenue and revenue"
+    assert store.find_lower("doc", "revenue") == 8
+    assert store.find_lower("doc", "profit") == -1
+
+    store["ascii"] = "Gross MARGIN and margin"
+    assert store.find_lower("ascii", "margin") == 6
+    assert store.find_lower("ascii", "and margin") == 13
+
+
+def test_directory_removed_with_store(tmp_path):
+    store = DocumentStore(str(tmp_path))
+    store["doc"] = "text"
+    assert list(tmp_path.iterdir())
+    store._finalizer()
+    assert not list(tmp_path.iterdir())
+
+
+def test_generation_moves_on_every_write(store):
+    seen = {store.generation}
+    for write in (
+        lambda: store.__setitem__("a", "one"),
+        lambda: store.__setitem__("a", "two"),
+        lambda: store.__delitem__("a"),
+        store.clear,
+    ):
+        write()
+        assert store.generation not in seen
+        seen.add(store.generation)
+    assert "a" not in store